@@ -3,17 +3,18 @@ import datetime as dt
 import pandas as pd
 import plotly.graph_objects as go
 from collections import Counter
+from utils import select_employee, summary_from_aggregates
 
 # ======= صفحة مقارنة الموظفين =======
-def show(df, emp_info, names):
+def show(df, emp_info, names, aggs=None):
     st.title("👥 Compare Employees")
 
     # ========== اختيار الموظفين ==========
     col1, col2 = st.columns(2)
     with col1:
-        n1 = st.selectbox("👤 Employee 1", names, key="compare_n1")
+        n1 = select_employee("👤 Employee 1", names, key="compare_n1")
     with col2:
-        n2 = st.selectbox("👤 Employee 2", [n for n in names if n != n1], key="compare_n2")
+        n2 = select_employee("👤 Employee 2", names, key="compare_n2", exclude=(n1,))
 
     # ========== نطاق التاريخ ==========
     col1, col2 = st.columns(2)
@@ -22,8 +23,6 @@ def show(df, emp_info, names):
     with col2:
         end = st.date_input("📅 End Date", dt.date(2025, 11, 30), key="compare_end")
 
-    d1 = df[(df["name"] == n1) & (df["date"].dt.date.between(start, end))].copy()
-    d2 = df[(df["name"] == n2) & (df["date"].dt.date.between(start, end))].copy()
 
     # ========== أكواد العمل ==========
     WORK_CODES = {"M","T","N","M1","M2","M3","T1","T2","T3","N1","N2","N3","1","2","3"}
@@ -74,7 +73,14 @@ def show(df, emp_info, names):
         summary["Rotation%"] = round(correct / total * 100, 2) if total > 0 else 0
         return summary
 
-    s1, s2 = summarize(d1), summarize(d2)
+    if aggs is None:
+        d1 = df[(df["name"] == n1) & (df["date"].dt.date.between(start, end))].copy()
+        d2 = df[(df["name"] == n2) & (df["date"].dt.date.between(start, end))].copy()
+        s1, s2 = summarize(d1), summarize(d2)
+    else:
+        empty = summarize(pd.DataFrame(columns=["code"]))
+        s1 = summary_from_aggregates(aggs, n1, start, end) or empty
+        s2 = summary_from_aggregates(aggs, n2, start, end) or empty
 
     st.markdown("---")
 
@@ -3,26 +3,25 @@ import plotly.graph_objects as go
 import pandas as pd
 import datetime as dt
 from collections import Counter
-from utils import WORK_CODES, create_metric_card
+from utils import WORK_CODES, shift_type, select_employee, create_metric_card, coworking_from_aggregates, load_coworking_counts
 
-def show(df, emp_info, names):
+def show(df, emp_info, names, aggs=None):
     st.title("🤝 Co-Working Analysis")
-    target = st.selectbox("👤 Select Employee", names)
+    target = select_employee("👤 Select Employee", names, key="coworking_name")
     top_n = st.slider("Show Top N", 5, 30, 10)
     start = st.date_input("📅 Start Date", dt.date(2025,1,1))
     end = st.date_input("📅 End Date", dt.date(2025,11,30))
-    df_work=df[df["code"].isin(WORK_CODES)&(df["date"].dt.date.between(start,end))].copy()
-    def shift_type(c):
-        if c in {"M","M1","M2","M3","1"}: return "Morning"
-        if c in {"T","T1","T2","T3","2"}: return "Afternoon"
-        if c in {"N","N1","N2","N3","3"}: return "Night"
-        return "Other"
-    df_work["shift"]=df_work["code"].apply(shift_type)
-    target_df=df_work[df_work["name"]==target]
-    cowork_counter=Counter()
-    for _,row in target_df.iterrows():
-        same=df_work[(df_work["date"]==row["date"])&(df_work["shift"]==row["shift"])&(df_work["name"]!=target)]
-        cowork_counter.update(same["name"].tolist())
+    if aggs is None:
+        df_work=df[df["code"].isin(WORK_CODES)&(df["date"].dt.date.between(start,end))].copy()
+        df_work["shift"]=df_work["code"].apply(shift_type)
+        target_df=df_work[df_work["name"]==target]
+        cowork_counter=Counter()
+        for _,row in target_df.iterrows():
+            same=df_work[(df_work["date"]==row["date"])&(df_work["shift"]==row["shift"])&(df_work["name"]!=target)]
+            cowork_counter.update(same["name"].tolist())
+    else:
+        full_history=start<=aggs["first_day"] and end>=aggs["last_day"]
+        cowork_counter=coworking_from_aggregates(aggs,target) if full_history else load_coworking_counts(target,start,end)
     if not cowork_counter:
         st.info("ℹ️ No coworkers found.")
         return
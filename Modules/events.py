@@ -1,10 +1,10 @@
 import streamlit as st
-from utils import eid_report
+from utils import eid_report, select_employee, load_employee_rows
 
-def show(df, names):
+def show(df, names, aggs=None):
     st.title("🎊 Special Calendar Events")
-    name = st.selectbox("👤 Select Employee", names)
-    emp = df[df["name"]==name]
+    name = select_employee("👤 Select Employee", names, key="events_name")
+    emp = df[df["name"]==name] if aggs is None else load_employee_rows(name)
     report = eid_report(emp)
     for k,v in report.items():
         with st.expander(f"**{k}**", expanded=True):
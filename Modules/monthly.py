@@ -1,34 +1,17 @@
 import streamlit as st
 import datetime as dt
 import plotly.graph_objects as go
+from utils import load_monthly_classes, select_employee
 
 # ======= التحليل الشهري =======
 def show(df, names):
     st.title("📅 Monthly Analysis")
 
     # ========== اختيار الموظف ==========
-    name = st.selectbox("👤 Select Employee", names, key="monthly_name")
-    emp = df[df["name"] == name].copy()
+    name = select_employee("👤 Select Employee", names, key="monthly_name")
 
-    # ========== تصنيف الرموز ==========
-    WORK_CODES = {"M","T","N","M1","M2","M3","T1","T2","T3","N1","N2","N3","1","2","3"}
-    REST_CODES = {"D"}
-    ANNUAL_LEAVE = {"V"}
-    COMP_LEAVE = {"F"}
-
-    def classify(code):
-        if code in WORK_CODES: return "Work"
-        if code in REST_CODES: return "Rest"
-        if code in ANNUAL_LEAVE: return "AnnualLeave"
-        if code in COMP_LEAVE: return "CompLeave"
-        return "Other"
-
-    emp["class"] = emp["code"].apply(classify)
-
-    # ========== إنشاء الجدول الشهري ==========
-    monthly = emp.groupby([emp["month"], "class"]).size().unstack(fill_value=0)
-    order = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-    monthly = monthly.reindex([m for m in order if m in monthly.index])
+    # ========== الجدول الشهري (من agg_monthly_class) ==========
+    monthly = load_monthly_classes(name)
 
     st.markdown("---")
     st.subheader("📋 Monthly Breakdown Table")
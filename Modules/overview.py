@@ -3,15 +3,16 @@ import datetime as dt
 import plotly.graph_objects as go
 from collections import Counter
 import pandas as pd
+from utils import select_employee, load_employee_rows
 
 # ======= الصفحة الرئيسية (Overview) =======
-def show(df, emp_info, names):
+def show(df, emp_info, names, aggs=None):
     st.title("🏠 Employee Overview")
 
     # ========== اختيار الموظف ==========
     col1, col2 = st.columns([2, 1])
     with col1:
-        name = st.selectbox("👤 Select Employee", names, key="overview_name")
+        name = select_employee("👤 Select Employee", names, key="overview_name")
     with col2:
         position = emp_info.loc[emp_info["name"] == name, "position"].values
         pos_text = position[0] if len(position) > 0 else "N/A"
@@ -24,7 +25,12 @@ def show(df, emp_info, names):
     with col2:
         end = st.date_input("📅 End Date", dt.date(2025, 11, 30), key="overview_end")
 
-    d = df[(df["name"] == name) & (df["date"].dt.date.between(start, end))].copy()
+    if aggs is None:
+        d = df[(df["name"] == name) & (df["date"].dt.date.between(start, end))].copy()
+    else:
+        # الوضع المتدفق: صفوف هذا الموظف فقط تكفي لحساب الصفحة كلها بدقة
+        d = load_employee_rows(name)
+        d = d[d["date"].dt.date.between(start, end)].copy()
 
     if d.empty:
         st.warning("⚠️ No data available for the selected period.")
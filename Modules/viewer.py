@@ -1,13 +1,21 @@
 import streamlit as st
 import datetime as dt
 import pandas as pd
+from utils import load_shift_headcount, select_employee, load_month_rows
 
-def show(df, names):
+def show(df, names, aggs=None):
     st.title("🕓 Schedule Viewer")
-    months = sorted(df["month"].unique(), key=lambda m: ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"].index(m))
+    order = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
+    if aggs is None: periods = sorted({f"{p//100}-{p%100:02d}" for p in (df["date"].dt.year*100+df["date"].dt.month).unique()})
+    else: periods = aggs["periods"]
+    years = sorted({p[:4] for p in periods})
+    sel_year = st.selectbox("📅 Select Year", years, index=len(years)-1)
+    months = [order[int(p[5:])-1] for p in periods if p[:4]==sel_year]
     sel_month = st.selectbox("📅 Select Month", months)
-    sel_name = st.selectbox("👤 Select Employee", ["All Employees"]+names)
-    subset = df[df["month"]==sel_month].copy()
+    period = f"{sel_year}-{order.index(sel_month)+1:02d}"
+    sel_name = select_employee("👤 Select Employee", names, key="viewer_name", extra=("All Employees",))
+    if aggs is None: subset = df[(df["date"].dt.year==int(sel_year))&(df["month"]==sel_month)].copy()
+    else: subset = load_month_rows(period).copy()
     if sel_name!="All Employees": subset=subset[subset["name"]==sel_name]
     if subset.empty:
         st.warning("⚠️ No data available.")
@@ -15,3 +23,9 @@ def show(df, names):
     subset["day"]=subset["date"].dt.day
     pivot=subset.pivot_table(index="name",columns="day",values="code",aggfunc="first").fillna("-")
     st.dataframe(pivot, use_container_width=True, height=600)
+    cov = load_shift_headcount(period)
+    if cov.empty: return
+    st.subheader("👥 Daily Shift Coverage")
+    cov["day"]=cov["date"].dt.day
+    cov_pivot=cov.pivot_table(index="shift",columns="day",values="headcount",aggfunc="sum").fillna(0).astype(int)
+    st.dataframe(cov_pivot, use_container_width=True)
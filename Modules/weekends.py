@@ -1,12 +1,11 @@
 import streamlit as st
 import plotly.graph_objects as go
-from utils import weekend_pattern, create_metric_card
+from utils import load_weekend_rests, select_employee, create_metric_card
 
 def show(df, names):
     st.title("🗓️ Weekend Pattern Analysis")
-    name = st.selectbox("👤 Select Employee", names)
-    emp = df[df["name"]==name]
-    res = weekend_pattern(emp)
+    name = select_employee("👤 Select Employee", names, key="weekends_name")
+    res = load_weekend_rests(name)
     if not res:
         st.warning("⚠️ No rest days found.")
         return
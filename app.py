@@ -18,14 +18,16 @@ st.set_page_config(
 )
 
 # ===== الاستيرادات =====
-from utils import load_schedules, load_employee_info
+from utils import load_schedules, load_employee_info, load_schedule_aggregates, use_streaming_mode
 from Modules import overview, compare, monthly, viewer, events, weekends, coworking
 
 
 # ===== تحميل البيانات =====
-df = load_schedules()
+# مع التاريخ الطويل: تجميع متدفق بدل تحميل جدول schedules كاملاً في الذاكرة
+aggs = load_schedule_aggregates() if use_streaming_mode() else None
+df = load_schedules() if aggs is None else None
 emp_info = load_employee_info()
-names = sorted(df["name"].unique())
+names = aggs["names"] if aggs is not None else sorted(df["name"].unique())
 
 # ===== الشريط الجانبي =====
 st.sidebar.title("🎯 Navigation")
@@ -46,6 +48,8 @@ page = st.sidebar.radio(
 )
 
 st.sidebar.markdown("---")
+if aggs is not None:
+    st.sidebar.caption("🌊 Streaming mode: date ranges are rounded to whole months.")
 
 # ===== عرض معلومات المستخدم الحالي =====
 user = st.session_state.get("user")
@@ -65,19 +69,19 @@ if role == "admin":
 
 # ===== تحميل الصفحة المختارة =====
 if page == "🏠 Overview":
-    overview.show(df, emp_info, names)
+    overview.show(df, emp_info, names, aggs)
 elif page == "👥 Compare Employees":
-    compare.show(df, emp_info, names)
+    compare.show(df, emp_info, names, aggs)
 elif page == "📅 Monthly Analysis":
     monthly.show(df, names)
 elif page == "🕓 Schedule Viewer":
-    viewer.show(df, names)
+    viewer.show(df, names, aggs)
 elif page == "🎊 Special Events":
-    events.show(df, names)
+    events.show(df, names, aggs)
 elif page == "🗓️ Weekend Patterns":
     weekends.show(df, names)
 elif page == "🤝 Co-Working Analysis":
-    coworking.show(df, emp_info, names)
+    coworking.show(df, emp_info, names, aggs)
 
 # ===== الفوتر =====
 st.markdown("---")
@@ -0,0 +1,52 @@
+import os
+import sys
+import sqlite3
+import datetime as dt
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils
+
+# نمط متكرر يضمن فترات عمل تتخطى حدود الدفعات والأشهر
+PATTERNS = {
+    "Abdulaziz Al Otaibi": ["M1", "M1", "T1", "T1", "N1", "D", "D"],
+    "Khaled Ayman Al Amery": ["T2", "T2", "N2", "N2", "M2", "M2", "D", "V"],
+    "Mohammed Saleh Alalwani": ["N3", "N3", "M3", "D", "F", "T3", "T3", "T3", "D"],
+    "Abdullah AlZahrani": ["1", "1", "1", "2", "2", "D", "AB", "3", "3", "B", "D"],
+    "Majed Abdullah Al-grnas": ["M", "T", "N", "M", "T", "N", "M", "D"],
+}
+
+
+def make_rows(start=dt.date(2024, 11, 20), days=120):
+    rows = []
+    for i in range(days):
+        day = start + dt.timedelta(days=i)
+        for name, pattern in PATTERNS.items():
+            code = pattern[i % len(pattern)]
+            rows.append((name, f"{day} 00:00:00", code, day.strftime("%b").upper(), day.year))
+    return rows
+
+
+def use_roster_db(path, monkeypatch):
+    """ينشئ قاعدة تجريبية في path ويوجّه utils إليها."""
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE schedules ("name" TEXT, "date" TIMESTAMP, "code" TEXT, "month" TEXT, "year" INTEGER)')
+    conn.executemany("INSERT INTO schedules VALUES (?, ?, ?, ?, ?)", make_rows())
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(utils, "DB_PATH", path)
+    monkeypatch.setattr(utils, "download_if_missing", lambda *a, **k: None)
+    utils.load_schedules.clear()
+    utils.load_schedule_aggregates.clear()
+    utils.init_aggregates.clear()
+    utils.load_employee_rows.clear()
+    utils.load_month_rows.clear()
+    utils.load_coworking_counts.clear()
+    return path
+
+
+@pytest.fixture
+def roster_db(tmp_path, monkeypatch):
+    return use_roster_db(str(tmp_path / "schedules.db"), monkeypatch)
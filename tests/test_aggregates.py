@@ -0,0 +1,69 @@
+import sqlite3
+
+import utils
+
+
+def _snapshot(conn):
+    return {
+        table: sorted(conn.execute(f"SELECT * FROM {table}").fetchall())
+        for table, *_ in utils._AGG_TABLES
+    }
+
+
+def test_triggers_match_full_rebuild(roster_db):
+    utils.ensure_files()
+    conn = sqlite3.connect(roster_db)
+    conn.execute("INSERT INTO schedules VALUES ('New Guy', '2025-03-01 00:00:00', 'm1', 'MAR', 2025)")
+    conn.execute("UPDATE schedules SET code = 'D' WHERE rowid IN (2, 40, 41)")
+    conn.execute("DELETE FROM schedules WHERE rowid BETWEEN 100 AND 160")
+    conn.commit()
+    incremental = _snapshot(conn)
+    utils.rebuild_aggregates(conn)
+    assert _snapshot(conn) == incremental
+    conn.close()
+
+
+def test_aggregates_match_dataframe(roster_db):
+    df = utils.load_schedules()
+    name = "Abdullah AlZahrani"
+    emp = df[df["name"] == name]
+    assert utils.load_weekend_rests(name) == utils.weekend_pattern(emp)
+    monthly = utils.load_monthly_classes(name)
+    expected = emp.groupby([emp["date"].dt.month, emp["code"].map(utils.classify)]).size()
+    for (month, cls), days in expected.items():
+        assert monthly.loc[utils.calendar.month_abbr[month], cls] == days
+
+
+def test_up_to_date_database_is_not_rewritten(roster_db):
+    utils.ensure_files()
+    before = open(roster_db, "rb").read()
+    utils.init_aggregates.clear()
+    utils.ensure_files()
+    utils.load_monthly_classes("Abdullah AlZahrani")
+    assert open(roster_db, "rb").read() == before
+
+
+def test_replaced_schedules_table_is_rebuilt(roster_db):
+    utils.ensure_files()
+    conn = sqlite3.connect(roster_db)
+    rows = conn.execute("SELECT name, date, code, month, year FROM schedules").fetchall()
+    # إعادة استيراد كاملة كما تفعل to_sql(if_exists="replace"): الـ triggers تُحذف مع الجدول
+    conn.execute("DROP TABLE schedules")
+    conn.execute('CREATE TABLE schedules ("name" TEXT, "date" TIMESTAMP, "code" TEXT, "month" TEXT, "year" INTEGER)')
+    changed = [(n, d, "V" if i % 3 == 0 else c, m, y) for i, (n, d, c, m, y) in enumerate(rows)]
+    conn.executemany("INSERT INTO schedules VALUES (?, ?, ?, ?, ?)", changed)
+    conn.commit()
+    utils.ensure_aggregates(conn)
+    after = _snapshot(conn)
+    utils.rebuild_aggregates(conn)
+    assert _snapshot(conn) == after
+    conn.close()
+
+
+def test_shift_headcount_is_limited_to_one_month(roster_db):
+    utils.ensure_files()
+    cov = utils.load_shift_headcount("2024-12")
+    assert not cov.empty
+    assert cov["date"].dt.strftime("%Y-%m").eq("2024-12").all()
+    assert cov["date"].dt.day.value_counts().max() == 3
+    assert utils.period_bounds("2024-12") == ("2024-12-01", "2025-01-01")
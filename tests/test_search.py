@@ -0,0 +1,67 @@
+import pytest
+
+import utils
+
+NAMES = (
+    "Abdulaziz Al Otaibi",
+    "Abdullah AlZahrani",
+    "Alaa Omar",
+    "Alexander Smith",
+    "Ali Hassan",
+    "Elizabeth Turner",
+    "Khaled Ayman Al Amery",
+    "Mohammed Saleh Alalwani",
+    "Nasser Al Qahtani",
+)
+POSITIONS = (
+    ("Ali Hassan", "Traffic Supervisor"),
+    ("Alaa Omar", "Data Analyst"),
+    ("Alexander Smith", "nan"),
+    ("Elizabeth Turner", ""),
+)
+
+
+@pytest.fixture(scope="module")
+def index():
+    return utils.build_search_index(NAMES, POSITIONS)
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Alex", "Alexander Smith"),
+    ("Eliz", "Elizabeth Turner"),
+    ("Alz", "Abdullah AlZahrani"),
+    ("alwani", "Mohammed Saleh Alalwani"),
+    ("Alalwani", "Mohammed Saleh Alalwani"),
+    ("otaybi", "Abdulaziz Al Otaibi"),
+    ("Abdul Aziz Alotaibi", "Abdulaziz Al Otaibi"),
+    ("عبدالعزيز العتيبي", "Abdulaziz Al Otaibi"),
+    ("العتيبي", "Abdulaziz Al Otaibi"),
+    ("Khalid", "Khaled Ayman Al Amery"),
+    ("superv", "Ali Hassan"),
+])
+def test_top_match(index, query, expected):
+    assert utils.search_employees(index, query)[0] == expected
+
+
+def test_typing_prefix_does_not_match_other_al_names(index):
+    results = utils.search_employees(index, "Alex")
+    assert "Alaa Omar" not in results
+    assert "Ali Hassan" not in results
+
+
+def test_every_prefix_keeps_the_name(index):
+    for name in ("Alexander Smith", "Elizabeth Turner", "Mohammed Saleh Alalwani"):
+        for n in range(1, len(name) + 1):
+            assert name in utils.search_employees(index, name[:n]), name[:n]
+
+
+def test_empty_query_lists_names(index):
+    assert utils.search_employees(index, "  ", limit=3) == list(NAMES[:3])
+
+
+def test_missing_positions_are_not_indexed(index):
+    for query in ("Na", "nan"):
+        results = utils.search_employees(index, query)
+        assert "Alexander Smith" not in results
+        assert "Elizabeth Turner" not in results
+    assert utils.search_employees(index, "Na")[0] == "Nasser Al Qahtani"
@@ -0,0 +1,113 @@
+import datetime as dt
+from collections import Counter
+
+import pytest
+
+import utils
+from conftest import use_roster_db
+
+# 5 موظفين في اليوم: الدفعات 3 و 7 و 12 تنقسم وسط اليوم ووسط فترات العمل
+CHUNKSIZES = [3, 7, 12, 10_000]
+RANGES = [
+    (None, None),
+    (dt.date(2024, 11, 1), dt.date(2024, 12, 31)),
+    (dt.date(2024, 12, 1), dt.date(2025, 2, 28)),
+    (dt.date(2025, 3, 1), dt.date(2025, 3, 31)),
+]
+
+
+def _in_range(df, start, end):
+    if start is None:
+        return df
+    return df[df["date"].dt.date.between(start, end)]
+
+
+def _coworking_loop(df, target):
+    """نفس حلقة صفحة Co-Working على البيانات الكاملة."""
+    work = df[df["code"].isin(utils.WORK_CODES)].copy()
+    work["shift"] = work["code"].apply(utils.shift_type)
+    counter = Counter()
+    for _, row in work[work["name"] == target].iterrows():
+        same = work[(work["date"] == row["date"]) & (work["shift"] == row["shift"]) & (work["name"] != target)]
+        counter.update(same["name"].tolist())
+    return counter
+
+
+@pytest.fixture(scope="module")
+def streamed_all(tmp_path_factory):
+    with pytest.MonkeyPatch.context() as mp:
+        use_roster_db(str(tmp_path_factory.mktemp("stream") / "schedules.db"), mp)
+        df = utils.load_schedules()
+        aggs = {size: utils.load_schedule_aggregates(chunksize=size) for size in CHUNKSIZES}
+        utils.load_schedule_aggregates.clear()
+        yield df, aggs
+
+
+@pytest.fixture(params=CHUNKSIZES)
+def streamed(streamed_all, request):
+    df, aggs = streamed_all
+    return df, aggs[request.param]
+
+
+@pytest.mark.parametrize("start, end", RANGES)
+def test_summary_matches_in_memory(streamed, start, end):
+    df, aggs = streamed
+    for name, emp in _in_range(df, start, end).groupby("name"):
+        assert utils.summary_from_aggregates(aggs, name, start, end) == utils.summarize(emp)
+
+
+@pytest.mark.parametrize("start, end", RANGES)
+def test_monthly_and_weekends_match_in_memory(streamed, start, end):
+    df, aggs = streamed
+    cls = aggs["classes"]
+    for name, emp in _in_range(df, start, end).groupby("name"):
+        assert utils.weekend_from_aggregates(aggs, name, start, end) == utils.weekend_pattern(emp)
+        emp = emp.assign(cls=emp["code"].apply(utils.classify))
+        expected = emp.groupby([emp["date"].dt.to_period("M").astype(str), "cls"]).size()
+        got = cls[(cls["name"] == name) & utils._period_mask(cls, start, end)]
+        assert got.set_index(["period", "class"])["days"].to_dict() == expected.to_dict()
+
+
+def test_coworking_matches_in_memory(streamed):
+    df, aggs = streamed
+    for name in df["name"].unique():
+        assert utils.coworking_from_aggregates(aggs, name) == _coworking_loop(df, name)
+
+
+def test_coworking_state_does_not_grow_with_history(streamed):
+    df, aggs = streamed
+    staff = df["name"].nunique()
+    assert len(aggs["coworking"]) <= staff * (staff - 1) // 2
+    assert aggs["first_day"] == df["date"].min().date()
+    assert aggs["last_day"] == df["date"].max().date()
+
+
+@pytest.mark.parametrize("start, end", RANGES[1:] + [(dt.date(2024, 12, 10), dt.date(2025, 1, 17))])
+def test_coworking_counts_for_date_range(streamed_all, start, end):
+    df, _ = streamed_all
+    df = _in_range(df, start, end)
+    for name in df["name"].unique():
+        assert utils.load_coworking_counts(name, start, end) == _coworking_loop(df, name)
+
+
+def test_row_loaders_match_in_memory(streamed_all):
+    df, _ = streamed_all
+    month = utils.load_month_rows("2025-01").sort_values(["date", "name"]).reset_index(drop=True)
+    expected = df[df["date"].dt.strftime("%Y-%m") == "2025-01"].sort_values(["date", "name"]).reset_index(drop=True)
+    assert month.equals(expected)
+    emp = utils.load_employee_rows("Abdullah AlZahrani").reset_index(drop=True)
+    assert emp.equals(df[df["name"] == "Abdullah AlZahrani"].sort_values("date").reset_index(drop=True))
+
+
+def test_empty_range_has_no_summary(streamed):
+    _, aggs = streamed
+    assert utils.summary_from_aggregates(aggs, "Abdullah AlZahrani", dt.date(2030, 1, 1), dt.date(2030, 2, 1)) is None
+
+
+def test_streaming_switch(roster_db, monkeypatch):
+    monkeypatch.setenv("SCHEDULE_STREAMING", "1")
+    assert utils.use_streaming_mode()
+    monkeypatch.setenv("SCHEDULE_STREAMING", "auto")
+    assert not utils.use_streaming_mode()
+    monkeypatch.setattr(utils, "STREAMING_ROWS", 100)
+    assert utils.use_streaming_mode()
@@ -1,4 +1,12 @@
 import os
+import re
+import bisect
+import heapq
+import calendar
+import unicodedata
+from itertools import combinations
+from pathlib import Path
+from collections import Counter
 import requests
 import pandas as pd
 import sqlite3
@@ -42,15 +50,15 @@ def download_if_missing(url, path, display_name=None):
 def ensure_files():
     download_if_missing(DB_URL, DB_PATH, "Schedules Database")
     download_if_missing(EMP_URL, EMP_INFO, "Employee Info")
+    init_aggregates(DB_PATH)
 
 # ==========================================================
 # 📚 تحميل بيانات الجداول
 # ==========================================================
-@st.cache_data
-def load_schedules():
+def _read_schedules(where="", params=()):
     ensure_files()
     conn = sqlite3.connect(DB_PATH)
-    df = pd.read_sql("SELECT * FROM schedules", conn, parse_dates=["date"])
+    df = pd.read_sql(f"SELECT * FROM schedules {where}", conn, params=params, parse_dates=["date"])
     conn.close()
     df["code"] = df["code"].astype(str).str.strip().str.upper()
     df["name"] = df["name"].astype(str).str.strip()
@@ -59,6 +67,20 @@ def load_schedules():
     df["weekday"] = df["date"].dt.day_name()
     return df
 
+@st.cache_data
+def load_schedules():
+    return _read_schedules()
+
+@st.cache_data(max_entries=64)
+def load_employee_rows(name):
+    """صفوف موظف واحد فقط (للوضع المتدفق بدل تحميل الجدول كاملاً)، عبر فهرس TRIM(name)."""
+    return _read_schedules("WHERE TRIM(name) = ? ORDER BY date", (name,))
+
+@st.cache_data(max_entries=12)
+def load_month_rows(period):
+    """صفوف كل الموظفين لشهر واحد "YYYY-MM"، عبر فهرس date."""
+    return _read_schedules("WHERE date >= ? AND date < ?", period_bounds(period))
+
 @st.cache_data
 def load_employee_info():
     ensure_files()
@@ -76,6 +98,11 @@ ANNUAL_LEAVE = {"V"}
 COMP_LEAVE = {"F"}
 ABSENT = {"AB"}
 SICK = {"B"}
+SHIFT_CODES = {
+    "Morning": {"M","M1","M2","M3","1"},
+    "Afternoon": {"T","T1","T2","T3","2"},
+    "Night": {"N","N1","N2","N3","3"},
+}
 
 def classify(code):
     if code in WORK_CODES: return "Work"
@@ -86,6 +113,11 @@ def classify(code):
     if code in SICK: return "Sick"
     return "Other"
 
+def shift_type(code):
+    for shift, codes in SHIFT_CODES.items():
+        if code in codes: return shift
+    return "Other"
+
 def summarize(df_emp):
     from collections import Counter
     df_emp = df_emp.copy()
@@ -146,6 +178,486 @@ def weekend_pattern(df_emp):
     ratio = round((fri + sat) / len(rests) * 100, 2) if len(rests) > 0 else 0
     return fri, sat, others, ratio
 
+# ==========================================================
+# 🗃️ جداول التجميع المحفوظة داخل schedules.db (تُحدَّث بالـ triggers)
+# ==========================================================
+# تعبيرات SQL لصف واحد من schedules ({r} = NEW أو OLD أو اسم الجدول)
+_AGG_NAME = "TRIM({r}.name)"
+_AGG_YEAR = "CAST(strftime('%Y', {r}.date) AS INTEGER)"
+_AGG_MONTH = "CAST(strftime('%m', {r}.date) AS INTEGER)"
+_AGG_WEEKDAY = "CAST(strftime('%w', {r}.date) AS INTEGER)"
+_AGG_DATE = "date({r}.date)"
+_AGG_CLASS = "COALESCE((SELECT class FROM code_classes WHERE code = UPPER(TRIM({r}.code))), 'Other')"
+_AGG_SHIFT = "(SELECT shift FROM code_classes WHERE code = UPPER(TRIM({r}.code)) AND class = 'Work')"
+
+# كل جدول: (الاسم, الأعمدة والتعبيرات, عمود العدّ, شرط الصف)
+_AGG_TABLES = [
+    ("agg_monthly_class",
+     [("name", _AGG_NAME), ("year", _AGG_YEAR), ("month", _AGG_MONTH), ("class", _AGG_CLASS)],
+     "days", None),
+    ("agg_rest_weekday",
+     [("name", _AGG_NAME), ("year", _AGG_YEAR), ("month", _AGG_MONTH), ("weekday", _AGG_WEEKDAY)],
+     "days", _AGG_CLASS + " = 'Rest'"),
+    ("agg_shift_headcount",
+     [("date", _AGG_DATE), ("shift", _AGG_SHIFT)],
+     "headcount", _AGG_SHIFT + " IS NOT NULL"),
+]
+
+def _agg_schema_sql():
+    stmts = ["CREATE TABLE IF NOT EXISTS code_classes (code TEXT PRIMARY KEY, class TEXT NOT NULL, shift TEXT)"]
+    for table, cols, count_col, _ in _AGG_TABLES:
+        keys = ", ".join(c for c, _ in cols)
+        stmts.append(
+            f"CREATE TABLE IF NOT EXISTS {table} ({keys}, {count_col} INTEGER NOT NULL DEFAULT 0, "
+            f"PRIMARY KEY ({keys}))"
+        )
+    return stmts
+
+def _agg_delta_sql(r, sign):
+    """خطوات SQL لإضافة (+) أو طرح (-) صف واحد من كل جداول التجميع."""
+    stmts = []
+    for table, cols, count_col, cond in _AGG_TABLES:
+        keys = ", ".join(c for c, _ in cols)
+        exprs = [e.format(r=r) for _, e in cols]
+        where = " AND ".join(f"{c} IS {e}" for (c, _), e in zip(cols, exprs))
+        guard = f" WHERE {cond.format(r=r)}" if cond else ""
+        stmts.append(f"INSERT OR IGNORE INTO {table} ({keys}) SELECT {', '.join(exprs)}{guard}")
+        stmts.append(
+            f"UPDATE {table} SET {count_col} = {count_col} {sign} 1 WHERE {where}"
+            + (f" AND {cond.format(r=r)}" if cond else "")
+        )
+        if sign == "-":
+            stmts.append(f"DELETE FROM {table} WHERE {where} AND {count_col} <= 0")
+    return stmts
+
+def _agg_triggers_sql():
+    body = {
+        "agg_schedules_ai": ("AFTER INSERT", _agg_delta_sql("NEW", "+")),
+        "agg_schedules_ad": ("AFTER DELETE", _agg_delta_sql("OLD", "-")),
+        "agg_schedules_au": ("AFTER UPDATE OF name, date, code", _agg_delta_sql("OLD", "-") + _agg_delta_sql("NEW", "+")),
+    }
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {name} {event} ON schedules FOR EACH ROW BEGIN "
+        + "; ".join(stmts) + "; END"
+        for name, (event, stmts) in body.items()
+    ]
+
+def _code_classes_rows():
+    codes = WORK_CODES | REST_CODES | ANNUAL_LEAVE | COMP_LEAVE | ABSENT | SICK
+    return sorted((c, classify(c), shift_type(c) if c in WORK_CODES else None) for c in codes)
+
+def rebuild_aggregates(conn):
+    """يعيد حساب جداول التجميع بالكامل من schedules (بعد تغيير تصنيف الرموز مثلاً)."""
+    conn.execute("DELETE FROM code_classes")
+    conn.executemany("INSERT INTO code_classes VALUES (?, ?, ?)", _code_classes_rows())
+    for table, cols, count_col, cond in _AGG_TABLES:
+        keys = ", ".join(c for c, _ in cols)
+        exprs = ", ".join(e.format(r="schedules") for _, e in cols)
+        guard = f" WHERE {cond.format(r='schedules')}" if cond else ""
+        group = ", ".join(str(i + 1) for i in range(len(cols)))
+        conn.execute(f"DELETE FROM {table}")
+        conn.execute(
+            f"INSERT INTO {table} ({keys}, {count_col}) "
+            f"SELECT {exprs}, COUNT(*) FROM schedules{guard} GROUP BY {group}"
+        )
+    conn.commit()
+
+# فهارس على schedules لقراءة موظف واحد أو شهر واحد في الوضع المتدفق
+_ROW_INDEXES = {
+    "idx_schedules_date": "CREATE INDEX IF NOT EXISTS idx_schedules_date ON schedules(date)",
+    "idx_schedules_name": "CREATE INDEX IF NOT EXISTS idx_schedules_name ON schedules(TRIM(name))",
+}
+_AGG_OBJECTS = {"code_classes", "agg_schedules_ai", "agg_schedules_ad", "agg_schedules_au"} | {t for t, *_ in _AGG_TABLES}
+
+def ensure_aggregates(conn):
+    """ينشئ جداول التجميع والـ triggers إن لم تكن موجودة، ويعيد بناءها إذا تغيّر تصنيف الرموز.
+    لا يكتب شيئاً في القاعدة إذا كانت محدّثة."""
+    existing = {r[0] for r in conn.execute("SELECT name FROM sqlite_master")}
+    missing = not _AGG_OBJECTS <= existing
+    if missing:
+        # مثلاً بعد to_sql(if_exists="replace"): حذف الجدول يحذف الـ triggers وتفوت التحديثات
+        for stmt in _agg_schema_sql() + _agg_triggers_sql():
+            conn.execute(stmt)
+    for index, stmt in _ROW_INDEXES.items():
+        if index not in existing:
+            conn.execute(stmt)
+    current = sorted(conn.execute("SELECT code, class, shift FROM code_classes").fetchall())
+    if missing or current != _code_classes_rows():
+        rebuild_aggregates(conn)
+    conn.commit()
+
+@st.cache_resource
+def init_aggregates(db_path):
+    """مرة واحدة لكل عملية (من ensure_files): تجهيز جداول التجميع في schedules.db."""
+    conn = sqlite3.connect(db_path)
+    try:
+        ensure_aggregates(conn)
+    finally:
+        conn.close()
+
+def _agg_query(sql, params=()):
+    ensure_files()
+    conn = sqlite3.connect(Path(DB_PATH).resolve().as_uri() + "?mode=ro", uri=True)
+    try:
+        return pd.read_sql(sql, conn, params=params)
+    finally:
+        conn.close()
+
+def load_monthly_classes(name):
+    """عدد أيام كل تصنيف لكل شهر (Jan..Dec) لموظف واحد، من agg_monthly_class."""
+    rows = _agg_query(
+        "SELECT month, class, SUM(days) AS days FROM agg_monthly_class "
+        "WHERE name = ? GROUP BY month, class",
+        (name,),
+    )
+    monthly = rows.pivot(index="month", columns="class", values="days").fillna(0).astype(int)
+    monthly = monthly.sort_index()
+    monthly.index = [calendar.month_abbr[m] for m in monthly.index]
+    monthly.columns.name = "class"
+    return monthly
+
+def load_weekend_rests(name):
+    """نفس مخرجات weekend_pattern لكن من agg_rest_weekday."""
+    rows = _agg_query(
+        "SELECT weekday, SUM(days) AS days FROM agg_rest_weekday WHERE name = ? GROUP BY weekday",
+        (name,),
+    )
+    total = int(rows["days"].sum())
+    if total == 0:
+        return None
+    by_day = dict(zip(rows["weekday"], rows["days"]))
+    fri = int(by_day.get(5, 0))
+    sat = int(by_day.get(6, 0))
+    others = total - fri - sat
+    ratio = round((fri + sat) / total * 100, 2)
+    return fri, sat, others, ratio
+
+def period_bounds(period):
+    """"YYYY-MM" -> (أول يوم فيه, أول يوم في الشهر التالي) كنصوص تُقارن مباشرة مع عمود date."""
+    year, month = map(int, period.split("-"))
+    return f"{period}-01", f"{year + month // 12}-{month % 12 + 1:02d}-01"
+
+def load_shift_headcount(period=None):
+    """عدد الموظفين في كل وردية لكل يوم (لشهر واحد "YYYY-MM" إن حُدِّد)، من agg_shift_headcount."""
+    sql = "SELECT date, shift, headcount FROM agg_shift_headcount"
+    params = ()
+    if period is not None:
+        sql += " WHERE date >= ? AND date < ?"
+        params = period_bounds(period)
+    cov = _agg_query(sql + " ORDER BY date, shift", params)
+    cov["date"] = pd.to_datetime(cov["date"])
+    return cov
+
+# ==========================================================
+# 🌊 تجميع متدفق للجداول الكبيرة (ذاكرة محدودة بحجم الدفعة)
+# ==========================================================
+STREAM_CHUNKSIZE = 50_000
+_EMPTY_RUN = (0, 0, 0, 0, False)   # (lead, correct, total, trail, has_rest)
+
+def _run_state(classes):
+    """حالة جزئية لحساب Rotation% من تسلسل تصنيفات مرتب بالتاريخ."""
+    lead = correct = total = trail = 0
+    has_rest = False
+    for c in classes:
+        if c == "Work":
+            if has_rest: trail += 1
+            else: lead += 1
+        elif c == "Rest":
+            if has_rest and trail > 0:
+                total += 1
+                correct += 4 <= trail <= 6
+            trail = 0
+            has_rest = True
+    return lead, correct, total, trail, has_rest
+
+def _merge_runs(a, b):
+    """يدمج حالتين متتاليتين (a قبل b) كأنهما تسلسل واحد."""
+    if not a[4]:
+        return a[0] + b[0], b[1], b[2], b[3], b[4]
+    if not b[4]:
+        return a[0], a[1], a[2], a[3] + b[0], True
+    mid = a[3] + b[0]
+    closed = mid > 0
+    return a[0], a[1] + b[1] + (closed and 4 <= mid <= 6), a[2] + b[2] + closed, b[3], True
+
+def _rotation(state):
+    lead, correct, total, trail, _ = state
+    for stretch in (lead, trail):
+        if stretch > 0:
+            total += 1
+            correct += 4 <= stretch <= 6
+    return round(correct / total * 100, 2) if total > 0 else 0
+
+def _coworking_pairs(work, pairs):
+    """يضيف لـ pairs عدد مرات اشتراك كل زوج (مرتب أبجدياً) في نفس اليوم والوردية.
+    يُعدّ كل يوم/وردية على حدة، فلا يُبنى جدول k² للدفعة كاملة."""
+    for _, names in work.groupby(["date", "shift"], sort=False)["name"]:
+        for a, b in combinations(names, 2):
+            if a != b:
+                pairs[(a, b) if a < b else (b, a)] += 1
+
+def _frame(counter, columns):
+    return pd.DataFrame([(*k, v) for k, v in counter.items()], columns=columns)
+
+@st.cache_resource
+def load_schedule_aggregates(chunksize=STREAM_CHUNKSIZE):
+    """
+    بديل load_schedules للتاريخ الطويل: يقرأ schedules على دفعات (chunksize)
+    ويجمع كل دفعة في حالات جزئية قابلة للدمج، فلا يُحمَّل الجدول الخام بالذاكرة.
+
+    حجم الحالة لا يعتمد على عدد الصفوف لكنه ليس ثابتاً:
+    - classes / rests / runs مفتاحها (الموظف, الشهر "YYYY-MM") أي O(الموظفين × الأشهر)،
+      لتجيب الصفحات عن نطاقات أشهر: العدّادات تُجمع وحالات Rotation تُدمج بالترتيب.
+    - coworking لكامل التاريخ فقط، أي O(أزواج الموظفين) بلا نمو مع الأشهر؛
+      النطاقات الجزئية تُحسب من القاعدة عبر load_coworking_counts.
+    cache_resource: النتيجة مشتركة ولا تُنسخ مع كل rerun، فلا تعدّل عليها.
+    """
+    ensure_files()
+    classes, rests, pairs = Counter(), Counter(), Counter()
+    runs = {}
+    pending = None   # صفوف عمل آخر يوم في الدفعة (قد يكمل في الدفعة التالية)
+    first_day = last_day = None
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        chunks = pd.read_sql("SELECT name, date, code FROM schedules ORDER BY date, name, rowid",
+                             conn, parse_dates=["date"], chunksize=chunksize)
+        for chunk in chunks:
+            chunk["code"] = chunk["code"].astype(str).str.strip().str.upper()
+            chunk["name"] = chunk["name"].astype(str).str.strip()
+            chunk["class"] = chunk["code"].map(classify)
+            chunk["period"] = chunk["date"].dt.strftime("%Y-%m")
+
+            classes.update(zip(chunk["name"], chunk["period"], chunk["class"]))
+            rest = chunk[chunk["code"] == "D"]
+            rests.update(zip(rest["name"], rest["period"], rest["date"].dt.day_name()))
+
+            for key, cls in chunk.groupby(["name", "period"], sort=False)["class"]:
+                runs[key] = _merge_runs(runs.get(key, _EMPTY_RUN), _run_state(cls))
+
+            work = chunk.loc[chunk["class"] == "Work", ["name", "date", "code"]]
+            work = work.assign(shift=work["code"].map(shift_type)).drop(columns="code")
+            if pending is not None:
+                work = pd.concat([pending, work], ignore_index=True)
+            last_day = chunk["date"].iloc[-1]
+            pending = work[work["date"] == last_day]
+            _coworking_pairs(work[work["date"] != last_day], pairs)
+            first_day = chunk["date"].iloc[0] if first_day is None else first_day
+        if pending is not None:
+            _coworking_pairs(pending, pairs)
+    finally:
+        conn.close()
+
+    return {
+        "names": sorted({name for name, _ in runs}),
+        "periods": sorted({period for _, period in runs}),
+        "first_day": first_day.date() if first_day is not None else None,
+        "last_day": last_day.date() if last_day is not None else None,
+        "classes": _frame(classes, ["name", "period", "class", "days"]),
+        "runs": runs,
+        "rests": _frame(rests, ["name", "period", "weekday", "days"]),
+        "coworking": _frame(pairs, ["a", "b", "SharedDays"]),
+    }
+
+def _period_mask(frame, start=None, end=None):
+    """start/end (تواريخ) تُقرَّب لأشهر كاملة."""
+    mask = pd.Series(True, index=frame.index)
+    if start is not None:
+        mask &= frame["period"] >= start.strftime("%Y-%m")
+    if end is not None:
+        mask &= frame["period"] <= end.strftime("%Y-%m")
+    return mask
+
+def summary_from_aggregates(aggs, name, start=None, end=None):
+    """نفس مخرجات summarize لموظف خلال نطاق أشهر، أو None إذا لا توجد بيانات."""
+    cls = aggs["classes"]
+    sel = cls[(cls["name"] == name) & _period_mask(cls, start, end)]
+    if sel.empty:
+        return None
+    cnt = sel.groupby("class")["days"].sum()
+    periods = pd.DataFrame({"period": aggs["periods"]})
+    state = _EMPTY_RUN
+    for period in periods.loc[_period_mask(periods, start, end), "period"]:
+        state = _merge_runs(state, aggs["runs"].get((name, period), _EMPTY_RUN))
+    return {
+        "Work": int(cnt.get("Work", 0)),
+        "Rest": int(cnt.get("Rest", 0)),
+        "V": int(cnt.get("AnnualLeave", 0)),
+        "F": int(cnt.get("CompLeave", 0)),
+        "AB": int(cnt.get("Absent", 0)),
+        "B": int(cnt.get("Sick", 0)),
+        "Rotation%": _rotation(state),
+    }
+
+def weekend_from_aggregates(aggs, name, start=None, end=None):
+    """نفس مخرجات weekend_pattern."""
+    rests = aggs["rests"]
+    sel = rests[(rests["name"] == name) & _period_mask(rests, start, end)]
+    total = int(sel["days"].sum())
+    if total == 0:
+        return None
+    by_day = sel.groupby("weekday")["days"].sum()
+    fri, sat = int(by_day.get("Friday", 0)), int(by_day.get("Saturday", 0))
+    return fri, sat, total - fri - sat, round((fri + sat) / total * 100, 2)
+
+def coworking_from_aggregates(aggs, name):
+    """Counter بعدد الأيام المشتركة مع كل زميل على كامل التاريخ، مثل حلقة صفحة Co-Working."""
+    cw = aggs["coworking"]
+    left, right = cw[cw["a"] == name], cw[cw["b"] == name]
+    return Counter(dict(zip(left["b"], left["SharedDays"]))) + Counter(dict(zip(right["a"], right["SharedDays"])))
+
+@st.cache_data(max_entries=64)
+def load_coworking_counts(name, start, end):
+    """نفس coworking_from_aggregates لنطاق تواريخ محدد، يحسبها SQLite عبر فهرسي date و TRIM(name)."""
+    rows = _agg_query(
+        "SELECT TRIM(o.name) AS Coworker, COUNT(*) AS SharedDays "
+        "FROM schedules t "
+        "JOIN code_classes ct ON ct.code = UPPER(TRIM(t.code)) AND ct.shift IS NOT NULL "
+        "JOIN schedules o ON o.date = t.date "
+        "JOIN code_classes co ON co.code = UPPER(TRIM(o.code)) AND co.shift = ct.shift "
+        "WHERE TRIM(t.name) = ? AND t.date >= ? AND t.date < ? AND TRIM(o.name) != TRIM(t.name) "
+        "GROUP BY TRIM(o.name)",
+        (name, str(start), str(end + pd.Timedelta(days=1))),
+    )
+    return Counter(dict(zip(rows["Coworker"], rows["SharedDays"])))
+
+STREAMING_ROWS = 2_000_000   # فوق هذا العدد من الصفوف يعمل الداشبورد بالتجميع المتدفق
+
+def use_streaming_mode():
+    """SCHEDULE_STREAMING=1/0 يفرض الوضع، وإلا يُختار حسب حجم جدول schedules."""
+    flag = os.environ.get("SCHEDULE_STREAMING", "auto").strip().lower()
+    if flag in {"1", "true", "on"}:
+        return True
+    if flag in {"0", "false", "off"}:
+        return False
+    ensure_files()
+    conn = sqlite3.connect(Path(DB_PATH).resolve().as_uri() + "?mode=ro", uri=True)
+    try:
+        rows = conn.execute("SELECT MAX(rowid) FROM schedules").fetchone()[0] or 0
+    finally:
+        conn.close()
+    return rows > STREAMING_ROWS
+
+# ==========================================================
+# 🔎 فهرس البحث عن الموظفين (بالاسم أو المسمى الوظيفي)
+# ==========================================================
+SEARCH_LIMIT = 50
+
+_AR_MARKS = re.compile("[\u064B-\u065F\u0670\u0640]")
+_AR_TO_LATIN = str.maketrans({
+    "ا": "a", "أ": "a", "إ": "a", "آ": "a", "ء": "", "ؤ": "w", "ئ": "y",
+    "ب": "b", "ت": "t", "ث": "th", "ج": "j", "ح": "h", "خ": "kh", "د": "d",
+    "ذ": "dh", "ر": "r", "ز": "z", "س": "s", "ش": "sh", "ص": "s", "ض": "d",
+    "ط": "t", "ظ": "z", "ع": "", "غ": "gh", "ف": "f", "ق": "q", "ك": "k",
+    "ل": "l", "م": "m", "ن": "n", "ه": "h", "ة": "", "و": "w", "ي": "y", "ى": "a",
+})
+
+def fold_text(text):
+    """يوحّد الكتابة: حروف صغيرة بلا تشكيل، والعربي يُحوَّل لحروف لاتينية."""
+    text = _AR_MARKS.sub("", str(text)).translate(_AR_TO_LATIN)
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return re.findall(r"[a-z0-9]+", text)
+
+def strip_article(token):
+    """يحذف "ال" من بداية الكلمة (Alotaibi -> otaibi)، و "al" المنفصلة تصبح فارغة."""
+    if token in {"al", "el"}:
+        return ""
+    if token[:2] in {"al", "el"} and len(token) >= 5:
+        return token[2:]
+    return token
+
+def skeleton(token):
+    """الهيكل الصوتي للكلمة: بدون حروف العلة والتكرار، حتى تتطابق صيغ النقل المختلفة."""
+    token = token.replace("q", "k")
+    token = re.sub(r"[aeiouyw]", "", token)
+    token = re.sub(r"(.)\1+", r"\1", token)
+    return token[:-1] if len(token) > 1 and token.endswith("h") else token
+
+def _trigrams(text):
+    text = "$$" + text
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def _token_variants(token):
+    """الكلمة كما هي وبدون "ال"، مع الهيكل الصوتي لكل منهما."""
+    stripped = strip_article(token)
+    return {token, stripped, skeleton(token), skeleton(stripped)} - {""}
+
+def _search_keys(text):
+    """الكلمات المطوية، وصيغها البديلة لكل كلمة، و trigrams النص كاملاً."""
+    tokens = fold_text(text)
+    stripped = [strip_article(t) for t in tokens]
+    grams = set()
+    for form in (tokens, stripped):
+        grams |= _trigrams("".join(form)) | _trigrams("".join(skeleton(t) for t in form))
+    return tokens, [_token_variants(t) for t in tokens], grams
+
+@st.cache_resource
+def build_search_index(names, positions):
+    """يبني الفهرس مرة واحدة لكل نسخة بيانات (names و positions عبارة عن tuples)."""
+    # load_employee_info يحوّل المسمى الفارغ إلى "nan" عبر astype(str)
+    pos = {name: p for name, p in positions if p and p.lower() != "nan"}
+    fields = []     # (id, الوزن)
+    prefixes = []   # (كلمة, رقم الحقل) مرتبة لبحث البادئات
+    grams = {}
+    for i, name in enumerate(names):
+        for text, weight in ((name, 1.0), (pos.get(name, ""), 0.8)):
+            if not text:
+                continue
+            f = len(fields)
+            fields.append((i, weight))
+            _, variants, tg = _search_keys(text)
+            prefixes.extend((t, f) for t in set().union(*variants))
+            for g in tg:
+                grams.setdefault(g, []).append(f)
+    prefixes.sort()
+    return {"names": list(names), "fields": fields, "prefixes": prefixes, "grams": grams}
+
+def _prefix_fields(index, prefix):
+    prefixes = index["prefixes"]
+    out = set()
+    i = bisect.bisect_left(prefixes, (prefix,))
+    while i < len(prefixes) and prefixes[i][0].startswith(prefix):
+        out.add(prefixes[i][1])
+        i += 1
+    return out
+
+def search_employees(index, query, limit=SEARCH_LIMIT):
+    """أفضل الأسماء المطابقة للنص المكتوب (بادئة كلمة أو تشابه trigram)."""
+    tokens, variants, tg = _search_keys(query)
+    if not tokens:
+        return index["names"][:limit]
+    score = Counter()
+    for g in tg:
+        for f in index["grams"].get(g, ()):
+            score[f] += 1 / len(tg)
+    hits = None
+    for tok, forms in zip(tokens, variants):
+        # الهيكل من حرف واحد يطابق كل شيء تقريباً، فيُهمل أثناء الكتابة
+        found = set().union(*(_prefix_fields(index, v) for v in forms if v == tok or len(v) > 1))
+        hits = found if hits is None else hits & found
+    for f in hits:
+        score[f] += 1
+    best = {}
+    for f, sc in score.items():
+        i, weight = index["fields"][f]
+        best[i] = max(best.get(i, 0), sc * weight)
+    ranked = heapq.nsmallest(limit, (i for i in best if best[i] >= 0.6),
+                             key=lambda i: (-best[i], index["names"][i]))
+    return [index["names"][i] for i in ranked]
+
+def select_employee(label, names, key, exclude=(), extra=()):
+    """بحث نصي + قائمة قصيرة بأفضل النتائج بدلاً من selectbox بكل الأسماء."""
+    emp = load_employee_info()
+    index = build_search_index(tuple(names), tuple(zip(emp["name"], emp["position"])))
+    query = st.text_input("🔎 Search employee", key=f"{key}_query",
+                          placeholder="Type a name or position (Arabic / English)")
+    matches = [n for n in search_employees(index, query, SEARCH_LIMIT + len(exclude)) if n not in exclude]
+    options = list(extra) + matches[:SEARCH_LIMIT]
+    if not options:
+        st.warning("⚠️ No matching employees.")
+        st.stop()
+    return st.selectbox(label, options, key=key)
+
 def create_metric_card(label, value, icon="📊"):
     return f"""
     <div class="metric-card">